@@ -0,0 +1,61 @@
+import re
+from array import array
+from typing import Iterator, Union
+
+
+class ByteGrid:
+    # Grid cells are bytes in one contiguous buffer, row y starts at y * stride.
+    # Rows are separated by a newline, so the buffer has the same layout as an input file
+    def __init__(self, data: Union[bytes, bytearray], width: int, height: int):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.stride = width + 1
+
+    @staticmethod
+    def from_lines(lines: list[str], writable: bool = False) -> "ByteGrid":
+        data = "".join(line + "\n" for line in lines).encode()
+
+        return ByteGrid(bytearray(data) if writable else data, len(lines[0]), len(lines))
+
+    def get_offset(self, x: int, y: int) -> int:
+        return y * self.stride + x
+
+    def get_coordinates(self, offset: int) -> tuple[int, int]:
+        y, x = divmod(offset, self.stride)
+        return x, y
+
+    def get(self, x: int, y: int) -> int:
+        return self.data[y * self.stride + x]
+
+    def set(self, x: int, y: int, value: int) -> None:
+        self.data[y * self.stride + x] = value
+
+    def get_row(self, y: int) -> memoryview:
+        start = y * self.stride
+        return memoryview(self.data)[start:start + self.width]
+
+    def get_column(self, x: int) -> memoryview:
+        return memoryview(self.data)[x:self.height * self.stride:self.stride]
+
+    def get_neighbor_offsets(self, x: int, y: int, diagonal: bool = True) -> Iterator[int]:
+        for n_y in range(max(y - 1, 0), min(y + 2, self.height)):
+            for n_x in range(max(x - 1, 0), min(x + 2, self.width)):
+                if (n_x, n_y) == (x, y):
+                    continue
+
+                if not diagonal and n_x != x and n_y != y:
+                    continue
+
+                yield n_y * self.stride + n_x
+
+    def find_all(self, value: bytes) -> array:
+        return self.find_all_matching(re.escape(value))
+
+    def find_all_matching(self, pattern: bytes) -> array:
+        # offsets of all pattern matches, scanning runs in C over the whole buffer
+        return array("q", [m.start() for m in re.finditer(pattern, self.data)])
+
+    def row_contains(self, y: int, value: bytes) -> bool:
+        start = y * self.stride
+        return self.data.find(value, start, start + self.width) != -1
@@ -1,7 +1,13 @@
-from typing import Callable
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterable, Optional
 
 
-def solve(lines: list[str], part: Callable) -> int:
+def solve(lines: Iterable[str], part: Callable) -> int:
     result: int = 0
 
     for line in lines:
@@ -10,6 +16,17 @@ def solve(lines: list[str], part: Callable) -> int:
     return result
 
 
+def solve_both_parts(lines: Iterable[str]) -> tuple[int, int]:
+    result_1 = 0
+    result_2 = 0
+
+    for line in lines:
+        result_1 += part_1(line)
+        result_2 += part_2(line)
+
+    return result_1, result_2
+
+
 def part_1(line: str) -> int:
     numbers = []
 
@@ -20,35 +37,144 @@ def part_1(line: str) -> int:
     return numbers[0] * 10 + numbers[-1]
 
 
+NON_DIGIT_BYTES = bytes(b for b in range(256) if not (ord("0") <= b <= ord("9") or b == ord("\n")))
+
+
+def solve_part_1_bytes(data: bytes) -> int:
+    # Every pass below runs inside bytes/re C loops, there is no per character Python code
+    digits = data.translate(None, NON_DIGIT_BYTES)
+
+    first_digits = b"".join(re.findall(rb"^\d", digits, re.MULTILINE))
+    last_digits = b"".join(re.findall(rb"\d$", digits, re.MULTILINE))
+
+    return 10 * sum_digits(first_digits) + sum_digits(last_digits)
+
+
+def sum_digits(digits: bytes) -> int:
+    return sum(d * digits.count(str(d).encode()) for d in range(1, 10))
+
+
+DIGIT_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9
+}
+
+
+def build_trie(words: dict[str, int]) -> dict:
+    trie = {}
+
+    for word, value in words.items():
+        node = trie
+        for c in word:
+            node = node.setdefault(c, {})
+
+        # None key marks the end of a word
+        node[None] = value
+
+    return trie
+
+
+DIGIT_TRIE = build_trie({**DIGIT_WORDS, **{str(d): d for d in range(10)}})
+
+
+def match_at(line: str, idx: int) -> Optional[int]:
+    node = DIGIT_TRIE
+
+    for pos in range(idx, len(line)):
+        node = node.get(line[pos])
+
+        if node is None:
+            return None
+
+        if None in node:
+            return node[None]
+
+    return None
+
+
 def part_2(line: str) -> int:
-    map = {
-        "one": 1,
-        "two": 2,
-        "three": 3,
-        "four": 4,
-        "five": 5,
-        "six": 6,
-        "seven": 7,
-        "eight": 8,
-        "nine": 9
-    }
+    # Matches are checked at every start position, so overlapping words like "twone" give 2 and 1
+    first = next(value for idx in range(len(line)) if (value := match_at(line, idx)) is not None)
+    last = next(value for idx in range(len(line) - 1, -1, -1) if (value := match_at(line, idx)) is not None)
 
-    numbers = []
+    return first * 10 + last
 
-    for i, c in enumerate(line):
-        if c.isnumeric():
-            numbers.append(int(c))
 
-        for key, value in map.items():
-            if line[i:].startswith(key):
-                numbers.append(value)
+def solve_sharded(path: str, part: Callable, workers: Optional[int] = None) -> int:
+    workers = workers or os.cpu_count()
+    shards = get_shard_ranges(path, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        starts = [start for start, _ in shards]
+        ends = [end for _, end in shards]
+
+        return sum(executor.map(solve_shard, repeat(path), starts, ends, repeat(part)))
+
+
+def get_shard_ranges(path: str, shards: int) -> list[tuple[int, int]]:
+    size = os.path.getsize(path)
+    boundaries = [0]
+
+    with open(path, "rb") as f:
+        for idx in range(1, shards):
+            # move every split point forward to the start of the next line
+            f.seek(max(size * idx // shards, boundaries[-1]))
+            f.readline()
+            boundaries.append(min(f.tell(), size))
+
+    boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
 
-    return numbers[0] * 10 + numbers[-1]
+
+def solve_shard(path: str, start: int, end: int, part: Callable) -> int:
+    result = 0
+
+    with open(path, "rb") as f:
+        f.seek(start)
+
+        while f.tell() < end:
+            result += part(f.readline().decode().strip())
+
+    return result
+
+
+def benchmark_sharded(path: str, part: Callable, workers: Optional[int] = None) -> float:
+    with open(path) as f:
+        start = time.perf_counter()
+        serial_result = solve((line.strip() for line in f), part)
+        serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sharded_result = solve_sharded(path, part, workers)
+    sharded_time = time.perf_counter() - start
+
+    if serial_result != sharded_result:
+        raise Exception(f"Sharded result {sharded_result} differs from serial result {serial_result}")
+
+    speedup = serial_time / sharded_time
+    print(f"{part.__name__}: serial {serial_time:.2f}s, sharded {sharded_time:.2f}s, speedup {speedup:.2f}x")
+
+    return speedup
 
 
 if __name__ == "__main__":
+    # python solution.py <path> [workers] compares sharded and serial runs on a big input
+    if len(sys.argv) > 1:
+        bench_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        benchmark_sharded(sys.argv[1], part_1, bench_workers)
+        benchmark_sharded(sys.argv[1], part_2, bench_workers)
+        sys.exit()
+
     with open("input.txt") as f:
-        lines = [line.strip() for line in f.readlines()]
+        result_1, result_2 = solve_both_parts(line.strip() for line in f)
 
-        print(f"Part 1: {solve(lines, part_1)}")
-        print(f"Part 2: {solve(lines, part_2)}")
+        print(f"Part 1: {result_1}")
+        print(f"Part 2: {result_2}")
@@ -1,50 +1,95 @@
-from typing import Optional
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+from common.grid import ByteGrid
+
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+
+PIPE_EXITS = {
+    "|": (UP, DOWN),
+    "-": (LEFT, RIGHT),
+    "L": (UP, RIGHT),
+    "J": (UP, LEFT),
+    "7": (DOWN, LEFT),
+    "F": (DOWN, RIGHT),
+}
+
+# (pipe, direction of movement into the pipe) -> direction of movement out of the pipe
+NEXT_DIRECTION = {
+    (pipe, (-entry[0], -entry[1])): exit
+    for pipe, exits in PIPE_EXITS.items()
+    for entry, exit in [exits, exits[::-1]]
+}
 
 
 def solve_part_1(lines: list[str]) -> int:
     grid = Grid(lines)
-    curve_points = get_curve_points(grid)
 
-    return len(curve_points) // 2
+    return len(grid.trace_loop()) // 2
 
 
-def get_curve_points(grid: "Grid") -> list[tuple[int, int]]:
-    current = grid.get_start_cell_coordinates()
-    visited = []
+class Loop:
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.xs = array("l")
+        self.ys = array("l")
+        self.cells = bytearray(width * height)
 
-    while True:
-        visited.append(current)
-        next_cell = grid.get_next_connected_cell(current[0], current[1], visited)
+    def add(self, x: int, y: int) -> None:
+        self.xs.append(x)
+        self.ys.append(y)
+        self.cells[y * self.width + x] = 1
 
-        if next_cell is None:
-            break
+    def contains(self, x: int, y: int) -> bool:
+        return self.cells[y * self.width + x] == 1
 
-        current = next_cell
+    def __len__(self) -> int:
+        return len(self.xs)
 
-    return visited
 
-
-# Use more complex ray tracing algorithm for a change
-def solve_part_2(lines: list[str]) -> int:
+def solve_part_2(lines: list[str], ray_tracing: bool = False) -> int:
     grid = Grid(lines)
-    curve_points = get_curve_points(grid)
+    loop = grid.trace_loop()
+
+    if ray_tracing:
+        return count_inside_points_ray_tracing(grid, loop)
+
+    return count_inside_points(loop)
+
+
+# Shoelace formula gives the loop area, Pick's theorem turns it into the number of cells inside
+def count_inside_points(loop: "Loop") -> int:
+    double_area = 0
 
+    for idx in range(len(loop)):
+        next_idx = (idx + 1) % len(loop)
+        double_area += loop.xs[idx] * loop.ys[next_idx] - loop.xs[next_idx] * loop.ys[idx]
+
+    return (abs(double_area) - len(loop)) // 2 + 1
+
+
+# Use more complex ray tracing algorithm for a change
+def count_inside_points_ray_tracing(grid: "Grid", loop: "Loop") -> int:
     outside_points = set()
     inside_points = set()
 
-    for y in range(len(lines) - 1):
-        for x in range(len(lines[y]) - 1):
-            if (x, y) in curve_points:
+    for y in range(grid.height - 1):
+        for x in range(grid.width - 1):
+            if loop.contains(x, y):
                 continue
 
-            if y == 0 or y == len(curve_points) - 1 or x == 0 or x == len(curve_points[y]) - 1:
+            if y == 0 or y == grid.height - 1 or x == 0 or x == grid.width - 1:
                 outside_points.add((x, y))
                 continue
 
             curve_crossed_times = 0
             curve_enter_symbol = None
             for ray_y in range(y - 1, -2, -1):
-                if (x, ray_y) in curve_points:
+                if ray_y >= 0 and loop.contains(x, ray_y):
                     symbol = grid.get(x, ray_y)
                     if symbol in ["L", "J"]:
                         curve_enter_symbol = symbol
@@ -74,41 +119,74 @@ def solve_part_2(lines: list[str]) -> int:
     return len(inside_points)
 
 
+class LoopIndex:
+    # Crossing parity for every cell, built with one scanline pass over each row.
+    # Loop cells with an exit up toggle parity, which is the same as counting |, L..7 and F..J as crossings
+    def __init__(self, grid: "Grid", loop: Loop):
+        self.loop = loop
+        self.width = grid.width
+        self.parity = bytearray(grid.width * grid.height)
+
+        for y in range(grid.height):
+            crossed = 0
+
+            for x, symbol in enumerate(grid.cells.get_row(y)):
+                if loop.contains(x, y) and symbol in b"|LJ":
+                    crossed ^= 1
+
+                self.parity[y * self.width + x] = crossed
+
+    def is_inside(self, x: int, y: int) -> bool:
+        return not self.loop.contains(x, y) and self.parity[y * self.width + x] == 1
+
+    def are_inside(self, points: Iterable[tuple[int, int]]) -> bytearray:
+        return bytearray(self.is_inside(x, y) for x, y in points)
+
+
 class Grid:
     def __init__(self, lines: list[str]):
-        self.lines = lines.copy()
-        self.start_cell_coordinates = self.get_start_cell_coordinates()
+        self.cells = ByteGrid.from_lines(lines, writable=True)
+        self.width = self.cells.width
+        self.height = self.cells.height
+        self.start_cell_coordinates = self._find_start_cell_coordinates()
         self._restore_start_cell_value()
 
+    def _find_start_cell_coordinates(self) -> tuple[int, int]:
+        offset = self.cells.data.find(b"S")
+        if offset == -1:
+            raise Exception("No start cell found")
+
+        return self.cells.get_coordinates(offset)
+
     def _restore_start_cell_value(self):
-        x, y = self.get_start_cell_coordinates()
+        x, y = self.start_cell_coordinates
 
-        if self.lines[y][x] != "S":
+        if self.get(x, y) != "S":
             return
 
         form = ""
 
         # up
         if y > 0:
-            value = self.lines[y - 1][x]
+            value = self.get(x, y - 1)
             if value in ["|", "7", "F"]:
                 form += "U"
 
         # down
-        if y < len(self.lines) - 1:
-            value = self.lines[y + 1][x]
+        if y < self.height - 1:
+            value = self.get(x, y + 1)
             if value in ["|", "L", "J"]:
                 form += "D"
 
         # left
         if x > 0:
-            value = self.lines[y][x - 1]
+            value = self.get(x - 1, y)
             if value in ["-", "L", "F"]:
                 form += "L"
 
         # right
-        if x < len(self.lines[0]) - 1:
-            value = self.lines[y][x + 1]
+        if x < self.width - 1:
+            value = self.get(x + 1, y)
             if value in ["-", "J", "7"]:
                 form += "R"
 
@@ -127,47 +205,35 @@ class Grid:
         else:
             raise Exception("Unexpected form " + form)
 
-        self.lines[y] = self.lines[y].replace("S", result)
-
-    def get_next_connected_cell(self, x: int, y: int, visited: list[tuple[int, int]]) -> Optional[tuple[int, int]]:
-        value = self.lines[y][x]
-
-        if value == "-":
-            connections = {(x - 1, y), (x + 1, y)}
-        elif value == "|":
-            connections = {(x, y + 1), (x, y - 1)}
-        elif value == "L":
-            connections = {(x, y - 1), (x + 1, y)}
-        elif value == "J":
-            connections = {(x, y - 1), (x - 1, y)}
-        elif value == "7":
-            connections = {(x, y + 1), (x - 1, y)}
-        elif value == "F":
-            connections = {(x, y + 1), (x + 1, y)}
-        else:
-            raise Exception("Unexpected cell value " + value)
+        self.cells.set(x, y, ord(result))
+
+    def get_start_cell_coordinates(self) -> tuple[int, int]:
+        return self.start_cell_coordinates
 
-        result = list(connections - set(visited))
+    def trace_loop(self) -> Loop:
+        # Every cell is visited once, next direction only depends on the pipe and the incoming direction
+        loop = Loop(self.width, self.height)
 
-        if len(result) == 0:
-            return None
+        x, y = self.start_cell_coordinates
+        direction = PIPE_EXITS[self.get(x, y)][0]
 
-        return result[0]
+        while True:
+            loop.add(x, y)
 
-    def get_start_cell_coordinates(self):
-        for y in range(len(self.lines)):
-            for x in range(len(self.lines[y])):
-                if self.lines[y][x] == "S":
-                    return x, y
+            x += direction[0]
+            y += direction[1]
 
-        return self.start_cell_coordinates
+            if (x, y) == self.start_cell_coordinates:
+                return loop
+
+            direction = NEXT_DIRECTION[(self.get(x, y), direction)]
 
     def get(self, x: int, y: int) -> str:
-        return self.lines[y][x]
+        return chr(self.cells.get(x, y))
 
 
 if __name__ == "__main__":
-    with open("input.txt") as f:
+    with open(Path(__file__).parent / "input.txt") as f:
         lines = [line.strip() for line in f.readlines()]
 
         print(f"Part 1: {solve_part_1(lines)}")  # 6714
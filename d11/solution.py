@@ -1,4 +1,8 @@
-from typing import Optional, List, Tuple
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterable
+
+from common.grid import ByteGrid
 
 
 def solve_part_1(lines: list[str]) -> int:
@@ -12,70 +16,53 @@ def solve_part_2(lines: list[str]) -> int:
 def solve(grid: "SpaceGrid", exp_rate: int) -> int:
     grid.expand_space(exp_rate)
 
-    galaxy_pairs = get_galaxy_pairs(grid.galaxies)
+    # Manhattan distance splits into independent x and y parts
+    x_distances = get_pairwise_distance_sum([x for x, _ in grid.galaxies])
+    y_distances = get_pairwise_distance_sum([y for _, y in grid.galaxies])
 
-    result = 0
-    for g1, g2 in galaxy_pairs:
-        exp_rate = abs(g1[0] - g2[0]) + abs(g1[1] - g2[1])
-        result += exp_rate
+    return x_distances + y_distances
 
-    return result
 
+def get_pairwise_distance_sum(coordinates: Iterable[int]) -> int:
+    # Over sorted coordinates, element idx is the bigger one in idx pairs, its distance to all of them is
+    # idx * coordinate - sum of the previous coordinates
+    result = 0
+    prefix_sum = 0
 
-def get_galaxy_pairs(galaxies: list[tuple[int, int]]) -> list[tuple[tuple[int, int], tuple[int, int]]]:
-    result = []
-
-    for g1_idx in range(len(galaxies) - 1):
-        for g2_idx in range(g1_idx + 1, len(galaxies)):
-            result.append((galaxies[g1_idx], galaxies[g2_idx]))
+    for idx, coordinate in enumerate(sorted(coordinates)):
+        result += idx * coordinate - prefix_sum
+        prefix_sum += coordinate
 
     return result
 
 
 class SpaceGrid:
     def __init__(self, lines: list[str]):
-        self.lines = lines.copy()
+        self.cells = ByteGrid.from_lines(lines)
         self.galaxies = self._get_initial_galaxy_positions()
 
     def expand_space(self, exp_rate: int) -> None:
-        for idx in range(len(self.lines) - 1, -1, -1):
-            if all([elem == "." for elem in self.lines[idx]]):
-                self._move_galaxies_down(idx, exp_rate)
+        galaxy_columns = {x for x, _ in self.galaxies}
 
-        for idx in range(len(self.lines[0]) - 1, -1, -1):
-            if all([elem == "." for elem in self._get_column(idx)]):
-                self._move_galaxies_right(idx, exp_rate)
+        # number of empty rows/columns before every index, each galaxy is then shifted once
+        empty_rows_before = get_counts_before([not self.cells.row_contains(y, b"#") for y in range(self.cells.height)])
+        empty_columns_before = get_counts_before([x not in galaxy_columns for x in range(self.cells.width)])
 
-    def _get_column(self, idx: int) -> str:
-        return ''.join([row[idx] for row in self.lines])
+        self.galaxies = [
+            (g_x + empty_columns_before[g_x] * (exp_rate - 1), g_y + empty_rows_before[g_y] * (exp_rate - 1))
+            for g_x, g_y in self.galaxies
+        ]
 
     def _get_initial_galaxy_positions(self) -> list[tuple[int, int]]:
-        result = []
-
-        for y, line in enumerate(self.lines):
-            for x, symbol in enumerate(line):
-                if symbol == "#":
-                    result.append((x, y))
-
-        return sorted(result)
-
-    def _move_galaxies_down(self, min_y: int, exp_rate: int) -> None:
-        for idx, galaxy in enumerate(self.galaxies):
-            g_x, g_y = galaxy
-
-            if g_y > min_y:
-                self.galaxies[idx] = (g_x, g_y + exp_rate - 1)
+        return sorted(self.cells.get_coordinates(offset) for offset in self.cells.find_all(b"#"))
 
-    def _move_galaxies_right(self, min_x: int, exp_rate: int) -> None:
-        for idx, galaxy in enumerate(self.galaxies):
-            g_x, g_y = galaxy
 
-            if g_x > min_x:
-                self.galaxies[idx] = (g_x + exp_rate - 1, g_y)
+def get_counts_before(flags: list[bool]) -> list[int]:
+    return list(accumulate(flags[:-1], initial=0))
 
 
 if __name__ == "__main__":
-    with open("input.txt") as f:
+    with open(Path(__file__).parent / "input.txt") as f:
         lines = [line.strip() for line in f.readlines()]
 
         print(f"Part 1: {solve_part_1(lines)}")  # 9329143
@@ -1,104 +1,141 @@
 import re
+from array import array
+from bisect import bisect_right
 from functools import reduce
+from typing import Iterable
 
+COLORS = ("red", "green", "blue")
 
-def solve_part_1(lines: list[str]) -> int:
-    max_available = {
-        'red': 12,
-        'green': 13,
-        'blue': 14,
-    }
+# max count of a color that never appears in a game, it fits any bag and is left out of the game power
+NOT_SHOWN = -1
 
-    result = 0
+MAX_AVAILABLE = {
+    'red': 12,
+    'green': 13,
+    'blue': 14,
+}
 
-    for line in lines:
-        game_id, sets = parse_game(line)
 
-        if all_sets_fit(sets, max_available):
-            result += game_id
+class GameTable:
+    # Columnar storage: one int column for game ids and one per color with the max count seen in any set
+    def __init__(self):
+        self.ids = array("q")
+        self.max_counts = {color: array("q") for color in COLORS}
 
-    return result
+    def add_game(self, line: str) -> None:
+        game_id, max_counts = parse_game(line)
 
+        self.ids.append(game_id)
+        for color, count in zip(COLORS, max_counts):
+            self.max_counts[color].append(count)
 
-def parse_games(lines: list[str]):
-    games = {}
+    def get_fitting_ids_sum(self, max_available: dict[str, int]) -> int:
+        columns = [self.max_counts[color] for color in COLORS]
 
-    for line in lines:
-        game_id, sets = parse_game(line)
-        games[game_id] = sets
+        result = 0
+        for game_id, *max_counts in zip(self.ids, *columns):
+            if game_fits(max_counts, max_available):
+                result += game_id
+
+        return result
 
-    return games
+    def get_power_sum(self) -> int:
+        columns = [self.max_counts[color] for color in COLORS]
+        return sum(get_game_power(max_counts) for max_counts in zip(*columns))
 
 
-def parse_game(line: str) -> tuple[int,  list[dict[str, int]]]:
+def parse_game(line: str) -> tuple[int, tuple[int, ...]]:
     game_str, sets_str = line.split(":")
 
     match = re.search(r"(\d+)", game_str)
     game_id = int(match.groups()[0])
 
-    sets = [parse_set(s) for s in sets_str.split(";")]
+    max_counts = dict.fromkeys(COLORS, NOT_SHOWN)
 
-    return game_id, sets
+    # Sets don't matter for either part, only the max count of every color across the whole game
+    for match in re.finditer(r"(\d+) (\w+)", sets_str):
+        count, color = match.groups()
+        max_counts[color] = max(max_counts[color], int(count))
 
+    return game_id, tuple(max_counts[color] for color in COLORS)
 
-def parse_set(set_value: str) -> dict[str, int]:
-    matches = {}
 
-    for match in re.finditer(r"(\d+) (\w+)", set_value):
-        groups = match.groups()
-        color = groups[1]
-        count = int(groups[0])
+def game_fits(max_counts: Iterable[int], max_available: dict[str, int]) -> bool:
+    return all(count <= max_available.get(color, 0) for color, count in zip(COLORS, max_counts))
 
-        matches[color] = count
 
-    return matches
+def get_game_power(max_counts: Iterable[int]) -> int:
+    return reduce(lambda x, y: x * y, [count for count in max_counts if count != NOT_SHOWN])
 
 
-def all_sets_fit(sets: list[dict[str, int]], max: dict[str, int]) -> bool:
-    for s in sets:
-        if not set_fits(s, max):
-            return False
+class GameIndex:
+    # 3D prefix sum of game ids over distinct red/green/blue counts, a bag query is three bisects and one lookup.
+    # Size is the product of distinct counts per color, which stays small as cube counts are small numbers
+    def __init__(self, table: GameTable):
+        columns = [table.max_counts[color] for color in COLORS]
+        self.values = [sorted(set(column)) for column in columns]
 
-    return True
+        sizes = [len(values) + 1 for values in self.values]
+        self.strides = (sizes[1] * sizes[2], sizes[2], 1)
+        self.prefix = [0] * (sizes[0] * sizes[1] * sizes[2])
 
+        positions = [{value: idx + 1 for idx, value in enumerate(values)} for values in self.values]
 
-def set_fits(s: dict[str, int], max: dict[str, int]) -> bool:
-    for color, max_count in max.items():
-        count = s.get(color, 0)
+        for game_id, *counts in zip(table.ids, *columns):
+            self.prefix[self._get_offset(*[p[count] for p, count in zip(positions, counts)])] += game_id
 
-        if count > max[color]:
-            return False
+        for stride, size in zip(self.strides, sizes):
+            for offset in range(len(self.prefix)):
+                if (offset // stride) % size != 0:
+                    self.prefix[offset] += self.prefix[offset - stride]
 
-    return True
+    def _get_offset(self, red_idx: int, green_idx: int, blue_idx: int) -> int:
+        return red_idx * self.strides[0] + green_idx * self.strides[1] + blue_idx * self.strides[2]
 
+    def get_fitting_ids_sum(self, max_available: dict[str, int]) -> int:
+        indexes = [bisect_right(values, max_available.get(color, 0)) for color, values in zip(COLORS, self.values)]
+        return self.prefix[self._get_offset(*indexes)]
 
-def solve_part_2(lines: list[str]) -> int:
-    result = 0
+    def get_fitting_ids_sums(self, limits: Iterable[dict[str, int]]) -> list[int]:
+        return [self.get_fitting_ids_sum(max_available) for max_available in limits]
+
+
+def parse_games(lines: Iterable[str]) -> GameTable:
+    table = GameTable()
 
     for line in lines:
-        game_id, sets = parse_game(line)
-        min_set = get_min_set(sets)
-        game_power = reduce(lambda x, y: x*y, min_set.values())
-        result += game_power
+        table.add_game(line)
+
+    return table
 
-    return result
 
+def solve_part_1(lines: Iterable[str]) -> int:
+    return solve_both_parts(lines)[0]
 
-def get_min_set(sets: list[dict[str, int]]) -> dict[str, int]:
-    result = {}
 
-    for s in sets:
-        for color, count in s.items():
-            max_color_cnt = result.get(color, 0)
+def solve_part_2(lines: Iterable[str]) -> int:
+    return solve_both_parts(lines)[1]
+
+
+def solve_both_parts(lines: Iterable[str]) -> tuple[int, int]:
+    result_1 = 0
+    result_2 = 0
+
+    # games are folded one by one, nothing is kept per game
+    for line in lines:
+        game_id, max_counts = parse_game(line)
+
+        if game_fits(max_counts, MAX_AVAILABLE):
+            result_1 += game_id
 
-            result[color] = max(count, max_color_cnt)
+        result_2 += get_game_power(max_counts)
 
-    return result
+    return result_1, result_2
 
 
 if __name__ == "__main__":
     with open("input.txt") as f:
-        lines = [line.strip() for line in f.readlines()]
+        result_1, result_2 = solve_both_parts(line.strip() for line in f)
 
-        print(f"Part 1: {solve_part_1(lines)}")
-        print(f"Part 2: {solve_part_2(lines)}")
+        print(f"Part 1: {result_1}")
+        print(f"Part 2: {result_2}")
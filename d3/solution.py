@@ -1,137 +1,103 @@
-from functools import reduce
+import re
+from array import array
+from pathlib import Path
 
-from pydantic.dataclasses import dataclass
+from common.grid import ByteGrid
 
 
-@dataclass(frozen=True)
-class Point:
-    x: int
-    y: int
+class Schematic:
+    def __init__(self, lines: list[str]):
+        self.grid = ByteGrid.from_lines(lines)
 
-    def get_adjacent_points(self, max_y: int, max_x: int) -> list["Point"]:
-        possible_neighbors = [
-            # above
-            (self.y - 1, self.x - 1),
-            (self.y - 1, self.x),
-            (self.y - 1, self.x + 1),
+        # labels[offset] is the id of the number covering the grid cell or -1, ids index into values
+        self.labels = array("l", [-1]) * len(self.grid.data)
+        self.values: list[int] = []
 
-            # left, right
-            (self.y, self.x - 1),
-            (self.y, self.x + 1),
+        # rows are separated by newlines in the grid buffer, so a run of digits never spans two rows
+        for match in re.finditer(rb"\d+", self.grid.data):
+            for offset in range(match.start(), match.end()):
+                self.labels[offset] = len(self.values)
 
-            # below
-            (self.y + 1, self.x - 1),
-            (self.y + 1, self.x),
-            (self.y + 1, self.x + 1),
-        ]
+            self.values.append(int(match.group()))
 
-        result = []
-        for n_y, n_x in possible_neighbors:
-            if n_y < 0 or n_y > max_y or n_x < 0 or n_x > max_x:
-                continue
-            result.append(Point(y=n_y, x=n_x))
+    def get_adjacent_labels(self, offset: int) -> set[int]:
+        result = set()
 
-        return result
+        for n_offset in self.grid.get_neighbor_offsets(*self.grid.get_coordinates(offset)):
+            label = self.labels[n_offset]
 
-    def get_value(self, lines: list[str]) -> str:
-        return lines[self.y][self.x]
+            if label >= 0:
+                result.add(label)
 
+        return result
 
-@dataclass(frozen=True)
-class Number:
-    coords: Point
-    length: int
-    value: int
+    def get_symbol_offsets(self) -> array:
+        return self.grid.find_all_matching(rb"[^\d.\n]")
 
 
 def solve_part_1(lines: list[str]) -> int:
-    symbol_points = read_symbol_points(lines)
+    schematic = Schematic(lines)
 
-    digit_points = set()
-    for symbol_point in symbol_points:
-        d_points = get_adjacent_digits(lines, symbol_point)
-        digit_points |= d_points
+    part_labels = set()
+    for offset in schematic.get_symbol_offsets():
+        part_labels |= schematic.get_adjacent_labels(offset)
 
-    numbers = recreate_numbers(lines, digit_points)
-    return sum(n.value for n in numbers)
+    return sum(schematic.values[label] for label in part_labels)
 
 
-def solve_part_2(lines: list[str]) -> int:
-    star_points = read_star_points(lines)
+# Bitmask variant of part 1, every row is an int with bit x set for column x.
+# Whole row operations (dilation, OR of neighbor rows) run in C, Python only touches each number once
+def solve_part_1_bitmask(lines: list[str]) -> int:
+    width = len(lines[0])
+    touch_masks = [format(mask, f"0{width}b")[::-1] for mask in dilate(get_symbol_masks(lines), width)]
 
     result = 0
-    for star_point in star_points:
-        digit_points = get_adjacent_digits(lines, star_point)
-        numbers = recreate_numbers(lines, digit_points)
-
-        if len(numbers) == 2:
-            result += reduce((lambda x, y: x * y), [n.value for n in numbers])
+    for line, touch_mask in zip(lines, touch_masks):
+        for match in re.finditer(r"\d+", line):
+            if touch_mask.find("1", match.start(), match.end()) != -1:
+                result += int(match.group())
 
     return result
 
 
-def read_symbol_points(lines: list[str]) -> list[Point]:
-    points = []
-
-    for y, line in enumerate(lines):
-        for x, char in enumerate(line):
-            if char == ".":
-                continue
-            elif char.isnumeric():
-                continue
-            else:
-                points.append(Point(y=y, x=x))
-
-    return points
-
-
-def get_adjacent_digits(lines: list[str], symbol_point: Point) -> set[Point]:
-    max_x = len(lines[0]) - 1
-    max_y = len(lines) - 1
+def get_symbol_masks(lines: list[str]) -> list[int]:
+    non_symbols = str.maketrans("0123456789.", "0" * 11)
 
-    digits_points = set()
+    return [int(re.sub(r"[^0]", "1", line.translate(non_symbols))[::-1], 2) for line in lines]
 
-    for adj_point in symbol_point.get_adjacent_points(max_y, max_x):
-        if adj_point.get_value(lines).isnumeric():
-            digits_points.add(adj_point)
 
-    return digits_points
+def dilate(masks: list[int], width: int) -> list[int]:
+    full_row = (1 << width) - 1
+    horizontal = [(mask | mask << 1 | mask >> 1) & full_row for mask in masks]
 
+    result = []
+    for y, mask in enumerate(horizontal):
+        if y > 0:
+            mask |= horizontal[y - 1]
+        if y < len(horizontal) - 1:
+            mask |= horizontal[y + 1]
 
-def recreate_numbers(lines: list[str], digit_points: set[Point]) -> set[Number]:
-    numbers = set()
+        result.append(mask)
 
-    for digit_point in digit_points:
-        line = lines[digit_point.y]
-        x_start = digit_point.x
-        x_end = digit_point.x
-
-        while x_start > 0 and line[x_start - 1].isnumeric():
-            x_start -= 1
-
-        while x_end < len(line) - 1 and line[x_end + 1].isnumeric():
-            x_end += 1
-
-        value = int(line[x_start:x_end + 1])
-
-        numbers.add(Number(coords=Point(y=digit_point.y, x=x_start), length=x_end - x_start + 1, value=value))
+    return result
 
-    return numbers
 
+def solve_part_2(lines: list[str]) -> int:
+    schematic = Schematic(lines)
 
-def read_star_points(lines: list[str]) -> list[Point]:
-    points = []
+    result = 0
+    for offset in schematic.grid.find_all(b"*"):
+        labels = schematic.get_adjacent_labels(offset)
 
-    for y, line in enumerate(lines):
-        for x, char in enumerate(line):
-            if char == "*":
-                points.append(Point(y=y, x=x))
+        if len(labels) == 2:
+            label_1, label_2 = labels
+            result += schematic.values[label_1] * schematic.values[label_2]
 
-    return points
+    return result
 
 
 if __name__ == "__main__":
-    with open("input.txt") as f:
+    with open(Path(__file__).parent / "input.txt") as f:
         lines = [line.strip() for line in f.readlines()]
 
         print(f"Part 1: {solve_part_1(lines)}")  # 519444
@@ -1,61 +1,95 @@
+from array import array
+from collections import deque
+from typing import Iterable
+
+
 def get_card_winning_numbers_count(line: str) -> int:
     _, scores = line.split(":")
+    winning_numbers, my_numbers = scores.split("|")
+
+    # Card numbers are small, so each side fits into an int bitmask and matches are a popcount of AND
+    return bin(get_numbers_mask(winning_numbers) & get_numbers_mask(my_numbers)).count("1")
+
+
+def get_numbers_mask(numbers: str) -> int:
+    mask = 0
+
+    for number in numbers.split():
+        mask |= 1 << int(number)
 
-    winning_numbers = set([int(c) for c in scores.split("|")[0].strip().split(" ") if c.isnumeric()])
-    my_numbers = set([int(c) for c in scores.split("|")[1].strip().split(" ") if c.isnumeric()])
+    return mask
 
-    my_winning_numbers = my_numbers.intersection(winning_numbers)
 
-    return len(my_winning_numbers)
+def get_winning_numbers_counts(lines: Iterable[str]) -> array:
+    return array("l", map(get_card_winning_numbers_count, lines))
 
 
-def solve_part_1(lines: list[str]) -> int:
+def solve_part_1(lines: Iterable[str]) -> int:
     scores = 0
 
     for line in lines:
-        winning_numbers_count = get_card_winning_numbers_count(line)
+        scores += get_card_score(get_card_winning_numbers_count(line))
 
-        if winning_numbers_count == 0:
-            continue
+    return scores
 
-        score = 2 ** (winning_numbers_count - 1)
-        scores += score
 
-    return scores
+def get_card_score(winning_numbers_count: int) -> int:
+    if winning_numbers_count == 0:
+        return 0
+
+    return 2 ** (winning_numbers_count - 1)
 
 
-class Card:
-    def __init__(self, winning_numbers_count: int):
-        self.number_of_copies = 1
-        self.winning_numbers_count = winning_numbers_count
+class CardCounter:
+    def __init__(self):
+        self.number_of_cards = 0
 
-    def add_copies(self, number_of_copies: int):
-        self.number_of_copies += number_of_copies
+        # Difference array of copies won for the upcoming cards, never longer than the max winning numbers count + 1
+        self.pending_copies = deque()
+        self.extra_copies = 0
 
+    def add_card(self, winning_numbers_count: int):
+        if self.pending_copies:
+            self.extra_copies += self.pending_copies.popleft()
 
-def solve_part_2(lines: list[str]) -> int:
-    cards = []
+        number_of_copies = 1 + self.extra_copies
+        self.number_of_cards += number_of_copies
+
+        if winning_numbers_count == 0:
+            return
+
+        while len(self.pending_copies) <= winning_numbers_count:
+            self.pending_copies.append(0)
+
+        self.pending_copies[0] += number_of_copies
+        self.pending_copies[winning_numbers_count] -= number_of_copies
+
+
+def solve_part_2(lines: Iterable[str]) -> int:
+    counter = CardCounter()
 
     for line in lines:
-        winning_numbers_count = get_card_winning_numbers_count(line)
-        cards.append(Card(winning_numbers_count))
+        counter.add_card(get_card_winning_numbers_count(line))
 
-    for idx in range(len(cards)):
-        card = cards[idx]
+    return counter.number_of_cards
 
-        for i in range(card.winning_numbers_count):
-            cards[idx + i + 1].add_copies(card.number_of_copies)
 
-    number_of_cards = 0
-    for card in cards:
-        number_of_cards += card.number_of_copies
+def solve_both_parts(lines: Iterable[str]) -> tuple[int, int]:
+    scores = 0
+    counter = CardCounter()
+
+    for line in lines:
+        winning_numbers_count = get_card_winning_numbers_count(line)
+
+        scores += get_card_score(winning_numbers_count)
+        counter.add_card(winning_numbers_count)
 
-    return number_of_cards
+    return scores, counter.number_of_cards
 
 
 if __name__ == "__main__":
     with open("input.txt") as f:
-        lines = [line.strip() for line in f.readlines()]
+        result_1, result_2 = solve_both_parts(line.strip() for line in f)
 
-        print(f"Part 1: {solve_part_1(lines)}")
-        print(f"Part 2: {solve_part_2(lines)}")
+        print(f"Part 1: {result_1}")
+        print(f"Part 2: {result_2}")
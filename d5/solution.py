@@ -1,5 +1,7 @@
 import re
-from typing import Optional
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Optional
 
 
 def solve_part_1(lines: list[str]) -> int:
@@ -10,44 +12,24 @@ def solve_part_1(lines: list[str]) -> int:
 
 
 def solve_part_2(lines: list[str]) -> int:
-    def seed_in_range(seed: int) -> bool:
-        for start, rng in seed_ranges:
-            if start <= seed < start + rng:
-                return True
-
-        return False
-
-    seed_ranges = parse_seed_ranges(lines)
+    seed_ranges = [(start, start + rng) for start, rng in parse_seed_ranges(lines)]
     maps = parse_maps(lines)
 
-    # Seed to location function linearly grows except for range start points
-    # Minimum can be either at seed range start or at range start in one of the maps
-    seed_candidates = [s[0] for s in seed_ranges]
+    # Push whole seed intervals through the maps, minimum location is the lowest interval start
+    location_ranges = maps[0].forward_chain_ranges(merge_ranges(seed_ranges))
 
-    for m in maps:
-        for range_start in m.get_dst_range_starts():
-            seed_for_range_start = m.backward_chain(range_start)
-            seed_candidates.append(seed_for_range_start)
-
-    return get_min_location_for_seeds(list(filter(seed_in_range, seed_candidates)), maps)
+    return location_ranges[0][0]
 
 
 def get_min_location_for_seeds(seeds: list[int], maps: list["Map"]) -> int:
-    start_map = maps[0]
-
-    # using dict for easier debugging
-    seed_locations = {}
-    for seed in seeds:
-        location = start_map.forward_chain(seed)
-        seed_locations[seed] = location
-
-    result = min(seed_locations.values())
-    return result
+    return min(compose_maps(maps).get_many(seeds))
 
 
 class Map:
     def __init__(self, mappings: list):
         self.mappings = mappings
+        self.sorted_mappings = sorted(mappings, key=lambda m: m[1])
+        self.src_starts = [src_start for _, src_start, _ in self.sorted_mappings]
         self.prev: Optional["Map"] = None
         self.next: Optional["Map"] = None
 
@@ -64,6 +46,42 @@ class Map:
 
         return src
 
+    def forward_chain_ranges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        res = self.forward_ranges(ranges)
+        if self.next is not None:
+            return self.next.forward_chain_ranges(res)
+        return res
+
+    # Ranges are [start, end) intervals, each one is split on mapping boundaries and the pieces shifted
+    def forward_ranges(self, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        result = []
+
+        for start, end in ranges:
+            idx = max(bisect_right(self.src_starts, start) - 1, 0)
+
+            while start < end:
+                if idx == len(self.sorted_mappings):
+                    result.append((start, end))
+                    break
+
+                dst_start, src_start, rng = self.sorted_mappings[idx]
+
+                if start < src_start:
+                    # not mapped gap before the next mapping
+                    gap_end = min(end, src_start)
+                    result.append((start, gap_end))
+                    start = gap_end
+                    continue
+
+                if start < src_start + rng:
+                    chunk_end = min(end, src_start + rng)
+                    result.append((start - src_start + dst_start, chunk_end - src_start + dst_start))
+                    start = chunk_end
+
+                idx += 1
+
+        return merge_ranges(result)
+
     def backward_chain(self, dst: int) -> int:
         res = self.backward(dst)
         if self.prev is not None:
@@ -78,8 +96,108 @@ class Map:
 
         return dst
 
-    def get_dst_range_starts(self) -> list[int]:
-        return [dst_start for dst_start, _, _ in self.mappings]
+
+class PiecewiseMap:
+    # Piece idx maps x in [starts[idx], starts[idx + 1]) to x + offsets[idx], the last piece is unbounded
+    def __init__(self, starts: list[int], offsets: list[int]):
+        self.starts = []
+        self.offsets = []
+
+        for start, offset in zip(starts, offsets):
+            if self.offsets and self.offsets[-1] == offset:
+                continue
+
+            self.starts.append(start)
+            self.offsets.append(offset)
+
+    @staticmethod
+    def from_map(m: Map) -> "PiecewiseMap":
+        starts = []
+        offsets = []
+
+        position = 0
+        for dst_start, src_start, rng in m.sorted_mappings:
+            if src_start > position:
+                starts.append(position)
+                offsets.append(0)
+
+            starts.append(src_start)
+            offsets.append(dst_start - src_start)
+            position = src_start + rng
+
+        starts.append(position)
+        offsets.append(0)
+
+        return PiecewiseMap(starts, offsets)
+
+    def get(self, src: int) -> int:
+        return src + self.offsets[bisect_right(self.starts, src) - 1]
+
+    def get_many(self, src: Iterable[int]) -> array:
+        return array("q", map(self.get, src))
+
+    def get_end(self, idx: int) -> Optional[int]:
+        return self.starts[idx + 1] if idx + 1 < len(self.starts) else None
+
+    def then(self, other: "PiecewiseMap") -> "PiecewiseMap":
+        starts = []
+        offsets = []
+
+        for idx, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            end = self.get_end(idx)
+
+            # split image of the piece on breakpoints of the other map
+            other_idx = bisect_right(other.starts, start + offset) - 1
+            starts.append(start)
+            offsets.append(offset + other.offsets[other_idx])
+
+            for other_idx in range(other_idx + 1, len(other.starts)):
+                other_start = other.starts[other_idx]
+
+                if end is not None and other_start >= end + offset:
+                    break
+
+                starts.append(other_start - offset)
+                offsets.append(offset + other.offsets[other_idx])
+
+        return PiecewiseMap(starts, offsets)
+
+    def inverse(self) -> "PiecewiseMap":
+        pieces = []
+        for idx, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            pieces.append((start + offset, self.get_end(idx), offset))
+
+        pieces.sort()
+
+        expected_start = 0
+        for dst_start, end, offset in pieces:
+            if expected_start is None or dst_start != expected_start:
+                raise Exception("Map is not a bijection, can't be inverted")
+
+            expected_start = None if end is None else end + offset
+
+        return PiecewiseMap([dst_start for dst_start, _, _ in pieces], [-offset for _, _, offset in pieces])
+
+
+def compose_maps(maps: list[Map]) -> PiecewiseMap:
+    result = PiecewiseMap.from_map(maps[0])
+
+    for m in maps[1:]:
+        result = result.then(PiecewiseMap.from_map(m))
+
+    return result
+
+
+def merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    result = []
+
+    for start, end in sorted(ranges):
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], max(result[-1][1], end))
+        else:
+            result.append((start, end))
+
+    return result
 
 
 def parse_maps(lines: list[str]) -> list[Map]:
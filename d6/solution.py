@@ -1,5 +1,7 @@
 import re
-from math import sqrt, ceil, floor
+import timeit
+from math import sqrt, ceil, floor, isqrt
+from typing import Iterable
 
 
 def solve_part_1(lines: list[str]) -> int:
@@ -7,7 +9,7 @@ def solve_part_1(lines: list[str]) -> int:
     result = 1
 
     for race_time, min_distance in inp:
-        result *= solve_quadratic_equation(race_time, min_distance)
+        result *= solve_exact(race_time, min_distance)
 
     return result
 
@@ -36,6 +38,49 @@ def solve_quadratic_equation(time, distance) -> int:
     return t_end - t_start + 1
 
 
+# Same roots as solve_quadratic_equation but with integer square root, exact for ints of any size
+def solve_exact(time: int, distance: int) -> int:
+    d = time * time - 4 * distance
+    if d < 0:
+        return 0
+
+    # first winning press time is either this estimate or the next one
+    t_start = (time - isqrt(d)) // 2
+    if t_start * (time - t_start) <= distance:
+        t_start += 1
+
+    if t_start * (time - t_start) <= distance:
+        return 0
+
+    # winning press times are symmetric around time / 2
+    t_end = time - t_start
+
+    return t_end - t_start + 1
+
+
+def solve_exact_many(races: Iterable[tuple[int, int]]) -> list[int]:
+    return [solve_exact(time, distance) for time, distance in races]
+
+
+def benchmark(time: int, distance: int, number: int = 10, brute_force_max_time: int = 10 ** 7) -> None:
+    solvers = [("exact", solve_exact), ("float", solve_quadratic_equation), ("brute force", solve_brute_force)]
+    expected = solve_exact(time, distance)
+
+    for name, solver in solvers:
+        if solver is solve_brute_force and time > brute_force_max_time:
+            print(f"{name}: skipped, time is too big")
+            continue
+
+        try:
+            result = solver(time, distance)
+        except OverflowError:
+            print(f"{name}: overflow")
+            continue
+
+        seconds = timeit.timeit(lambda: solver(time, distance), number=number) / number
+        print(f"{name}: {result} ({'ok' if result == expected else 'wrong'}) in {seconds * 1000:.3f} ms")
+
+
 def solve_brute_force(time, distance) -> int:
     win_ways = 0
 
@@ -49,7 +94,7 @@ def solve_brute_force(time, distance) -> int:
 
 def solve_part_2(lines: list[str]) -> int:
     time, distance = parse_input_p2(lines)
-    return solve_quadratic_equation(time, distance)
+    return solve_exact(time, distance)
 
 
 def parse_input_p2(lines: list[str]) -> tuple[int, int]:
@@ -1,5 +1,13 @@
+import heapq
+import tempfile
+from array import array
 from collections import Counter
+from contextlib import ExitStack
 from enum import Enum
+from functools import cache
+from itertools import chain, islice, product
+from operator import itemgetter
+from typing import BinaryIO, Iterable, Iterator
 
 
 class HandType(Enum):
@@ -12,25 +20,124 @@ class HandType(Enum):
     FIVE_OF_KIND = 7
 
 
-class Hand:
-    def __init__(self, cards: str, bid: int, jocker_enabled: bool = False):
+CARD_ORDER = "23456789TJQKA"
+JOCKER_CARD_ORDER = "J23456789TQKA"
+
+# Hands are encoded as 5 digit base 13 numbers, code order is the same as card by card comparison.
+# Score is hand type * HAND_CODES + code
+HAND_CODES = len(CARD_ORDER) ** 5
+CODE_DIGITS = "0123456789abc"
+
+
+class HandTable:
+    # Compact columns of scores and bids, ranking is a single sort over int scores
+    def __init__(self, jocker_enabled: bool = False):
+        self.jocker_enabled = jocker_enabled
+        self.scores = array("q")
+        self.bids = array("q")
+
+    def add_hand(self, cards: str, bid: int) -> None:
+        self.scores.append(get_hand_score(cards, self.jocker_enabled))
+        self.bids.append(bid)
+
+    def get_total_winnings(self) -> int:
+        order = sorted(range(len(self.scores)), key=self.scores.__getitem__)
+
+        return sum(self.bids[idx] * rank for rank, idx in enumerate(order, 1))
+
+
+class HandRanking:
+    # Online ranking, total winnings are updated on every added hand without re-sorting.
+    # Fenwick trees are indexed by the hand position among all 13^5 hands, about 3 MB each
+    def __init__(self, jocker_enabled: bool = False):
         self.jocker_enabled = jocker_enabled
-        self.cards = cards
-        self.bid = bid
-        self.rank = 0
+        self.total_winnings = 0
+        self.hand_count = 0
+
+        self.positions = get_hand_positions(jocker_enabled)
+        self.counts = FenwickTree(HAND_CODES)
+        self.bids = FenwickTree(HAND_CODES)
+
+    def add_hand(self, cards: str, bid: int) -> None:
+        position = self.positions[encode_hand(cards, self.jocker_enabled)]
+
+        # new hand goes after equal ones, every hand above it moves one rank up
+        rank = self.counts.get_prefix_sum(position) + 1
+        self.total_winnings += bid * rank + self.bids.get_total() - self.bids.get_prefix_sum(position)
+
+        self.counts.add(position, 1)
+        self.bids.add(position, bid)
+        self.hand_count += 1
+
+
+class FenwickTree:
+    def __init__(self, size: int):
+        self.tree = array("q", bytes(8 * (size + 1)))
+
+    def add(self, idx: int, value: int) -> None:
+        idx += 1
+        while idx < len(self.tree):
+            self.tree[idx] += value
+            idx += idx & -idx
+
+    # sum of values at 0..idx
+    def get_prefix_sum(self, idx: int) -> int:
+        result = 0
+
+        idx += 1
+        while idx > 0:
+            result += self.tree[idx]
+            idx -= idx & -idx
+
+        return result
+
+    def get_total(self) -> int:
+        return self.get_prefix_sum(len(self.tree) - 2)
+
+
+def get_hand_score(cards: str, jocker_enabled: bool) -> int:
+    hand_type = get_multiset_hand_type("".join(sorted(cards)), jocker_enabled)
+    return hand_type.value * HAND_CODES + encode_hand(cards, jocker_enabled)
+
+
+# positions[code] is the rank of the hand score among all hands, hands are ordered type major with a counting sort
+@cache
+def get_hand_positions(jocker_enabled: bool) -> array:
+    card_order = JOCKER_CARD_ORDER if jocker_enabled else CARD_ORDER
+    types = array("b", [
+        get_multiset_hand_type("".join(sorted(cards)), jocker_enabled).value
+        for cards in product(card_order, repeat=5)
+    ])
+
+    type_counts = [0] * (len(HandType) + 1)
+    for hand_type in types:
+        type_counts[hand_type] += 1
+
+    next_positions = [0] * (len(HandType) + 1)
+    for hand_type in range(1, len(HandType) + 1):
+        next_positions[hand_type] = next_positions[hand_type - 1] + type_counts[hand_type - 1]
+
+    positions = array("l", bytes(array("l").itemsize * HAND_CODES))
+    for code, hand_type in enumerate(types):
+        positions[code] = next_positions[hand_type]
+        next_positions[hand_type] += 1
 
-        self.hand_type = get_best_hand_type(cards) if jocker_enabled else get_hand_type(cards)
-        self.score = self.hand_type.value * 16 ** 5 + self.get_card_score()
+    return positions
 
-    def get_card_score(self) -> int:
-        score = 0
-        for idx, card in enumerate(self.cards[::-1]):
-            score += get_card_value(card, self.jocker_enabled) * 16 ** idx
 
-        return score
+def encode_hand(cards: str, jocker_enabled: bool) -> int:
+    return int(cards.translate(get_code_translation(jocker_enabled)), len(CARD_ORDER))
 
-    def get_won_bid(self) -> int:
-        return self.bid * self.rank
+
+@cache
+def get_code_translation(jocker_enabled: bool) -> dict[int, int]:
+    return str.maketrans(JOCKER_CARD_ORDER if jocker_enabled else CARD_ORDER, CODE_DIGITS)
+
+
+# Type only depends on the card multiset (sorted cards), there are 6188 of them per variant
+@cache
+def get_multiset_hand_type(sorted_cards: str, jocker_enabled: bool) -> HandType:
+    return get_best_hand_type(sorted_cards) if jocker_enabled else get_hand_type(sorted_cards)
 
 
 def get_best_hand_type(cards: str) -> HandType:
@@ -90,55 +197,108 @@ def get_card_to_add(cards: str) -> str:
     return best_card
 
 
+CARD_VALUES = {
+    "A": 14,
+    "K": 13,
+    "Q": 12,
+    "J": 11,
+    "T": 10,
+    "9": 9,
+    "8": 8,
+    "7": 7,
+    "6": 6,
+    "5": 5,
+    "4": 4,
+    "3": 3,
+    "2": 2,
+}
+
+JOCKER_CARD_VALUES = {**CARD_VALUES, "J": 1}
+
+
 def get_card_value(card: str, jocker_enabled: bool) -> int:
-    card_values = {
-        "A": 14,
-        "K": 13,
-        "Q": 12,
-        "J": 1 if jocker_enabled else 11,
-        "T": 10,
-        "9": 9,
-        "8": 8,
-        "7": 7,
-        "6": 6,
-        "5": 5,
-        "4": 4,
-        "3": 3,
-        "2": 2,
-    }
-
-    return card_values[card]
-
-
-def solve_part_1(lines: list[str]) -> int:
+    return JOCKER_CARD_VALUES[card] if jocker_enabled else CARD_VALUES[card]
+
+
+def solve_part_1(lines: Iterable[str]) -> int:
     return solve(lines, jocker_enabled=False)
 
 
-def solve_part_2(lines: list[str]) -> int:
+def solve_part_2(lines: Iterable[str]) -> int:
     return solve(lines, jocker_enabled=True)
 
 
-def solve(lines: list[str], jocker_enabled: bool) -> int:
-    hands = []
+def solve(lines: Iterable[str], jocker_enabled: bool) -> int:
+    hands = HandTable(jocker_enabled)
+
+    for line in lines:
+        hands.add_hand(*parse_line(line))
+
+    return hands.get_total_winnings()
+
+
+def solve_both_parts(lines: Iterable[str]) -> tuple[int, int]:
+    hands = HandTable()
+    jocker_hands = HandTable(jocker_enabled=True)
 
     for line in lines:
-        cards, bid_str = line.split(" ")
-        bid = int(bid_str)
+        cards, bid = parse_line(line)
+
+        hands.add_hand(cards, bid)
+        jocker_hands.add_hand(cards, bid)
+
+    return hands.get_total_winnings(), jocker_hands.get_total_winnings()
+
+
+# Out of core variant of solve, at most chunk_size hands plus buffer_size pairs per sorted run are kept in memory
+def solve_external(lines: Iterable[str], jocker_enabled: bool, chunk_size: int = 1_000_000, buffer_size: int = 10_000) -> int:
+    lines = iter(lines)
+
+    with ExitStack() as stack:
+        runs = []
+
+        while chunk := list(islice(lines, chunk_size)):
+            # sort and merge on score only, equal hands then keep input order like in solve
+            scored_bids = [(get_hand_score(cards, jocker_enabled), bid) for cards, bid in map(parse_line, chunk)]
+            scored_bids.sort(key=itemgetter(0))
+
+            f = stack.enter_context(tempfile.TemporaryFile())
+            array("q", chain.from_iterable(scored_bids)).tofile(f)
+            f.seek(0)
+
+            runs.append(read_run(f, buffer_size))
+
+        result = 0
+        for rank, (_, bid) in enumerate(heapq.merge(*runs, key=itemgetter(0)), 1):
+            result += bid * rank
+
+        return result
+
+
+def read_run(f: BinaryIO, buffer_size: int) -> Iterator[tuple[int, int]]:
+    while True:
+        block = array("q")
+
+        try:
+            block.fromfile(f, 2 * buffer_size)
+        except EOFError:
+            # the last block is shorter, available items are still read
+            pass
 
-        hands.append(Hand(cards, bid, jocker_enabled))
+        if not block:
+            return
 
-    hands.sort(key=lambda h: h.score)
+        yield from zip(block[::2], block[1::2])
 
-    for idx, hand in enumerate(hands):
-        hand.rank = idx + 1
 
-    result = sum([hand.get_won_bid() for hand in hands])
-    return result
+def parse_line(line: str) -> tuple[str, int]:
+    cards, bid_str = line.split(" ")
+    return cards, int(bid_str)
 
 
 if __name__ == "__main__":
     with open("input.txt") as f:
-        lines = [line.strip() for line in f.readlines()]
+        result_1, result_2 = solve_both_parts(line.strip() for line in f)
 
-        print(f"Part 1: {solve_part_1(lines)}")  # 250951660
-        print(f"Part 2: {solve_part_2(lines)}")  # 251481660
+        print(f"Part 1: {result_1}")  # 250951660
+        print(f"Part 2: {result_2}")  # 251481660
@@ -1,22 +1,49 @@
 import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from functools import reduce
+from itertools import product, repeat
+from typing import Optional
 
 
 def solve_part_1(lines: list[str]) -> int:
     directions, m = parse_input(lines)
+    network = Network(directions, m, end_nodes=["ZZZ"])
 
-    return get_number_of_steps(directions, m, "AAA", end_nodes=["ZZZ"])
+    return network.get_number_of_steps(network.ids["AAA"])
 
 
-def solve_part_2(lines: list[str]) -> int:
+def solve_part_2(lines: list[str], workers: Optional[int] = None) -> int:
     directions, m = parse_input(lines)
 
     nodes = [n for n in m.keys() if n[2] == "A"]
     end_nodes = [n for n in m.keys() if n[2] == "Z"]
+    ids, left, right, is_end = compile_nodes(m, end_nodes)
+
+    start_nodes = [ids[node] for node in nodes]
+
+    if workers is None or workers == 1:
+        cycles = [find_cycle(directions, left, right, is_end, start_node) for start_node in start_nodes]
+    else:
+        # Ghosts are independent, their cycles can be analyzed in separate processes
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            args = [repeat(directions), repeat(left), repeat(right), repeat(is_end), start_nodes]
+            cycles = list(executor.map(find_cycle, *args))
+
+    return get_first_common_end_step(cycles)
+
+
+def solve_part_2_lcm(lines: list[str]) -> int:
+    # Only correct when every ghost cycle starts at step 0 and has a single end node
+    directions, m = parse_input(lines)
+
+    nodes = [n for n in m.keys() if n[2] == "A"]
+    end_nodes = [n for n in m.keys() if n[2] == "Z"]
+    network = Network(directions, m, end_nodes)
 
     steps = []
     for node in nodes:
-        steps.append(get_number_of_steps(directions, m, node, end_nodes=end_nodes))
+        steps.append(network.get_number_of_steps(network.ids[node]))
 
     result = reduce(compute_lcm, steps)
     return result
@@ -39,22 +66,170 @@ def parse_input(lines: list[str]) -> tuple[str, dict[str, tuple[str, str]]]:
     return directions, m
 
 
-def get_number_of_steps(directions: str, m: dict[str, tuple[str, str]], start_node: str, end_nodes: list[str]) -> int:
-    node = start_node
+def compile_nodes(m: dict[str, tuple[str, str]], end_nodes: list[str]) -> tuple[dict[str, int], array, array, bytearray]:
+    ids = {name: idx for idx, name in enumerate(m.keys())}
+
+    left = array("l", [ids[left] for left, _ in m.values()])
+    right = array("l", [ids[right] for _, right in m.values()])
+    is_end = bytearray(len(ids))
+    for name in end_nodes:
+        is_end[ids[name]] = 1
+
+    return ids, left, right, is_end
+
+
+class Network:
+    def __init__(self, directions: str, m: dict[str, tuple[str, str]], end_nodes: list[str]):
+        self.directions = directions
+        self.names = list(m.keys())
+        self.ids, self.left, self.right, self.is_end = compile_nodes(m, end_nodes)
+
+        # Node after a full pass of directions and step of the first end node within that pass (0 if none)
+        self.pass_targets = array("l", [0] * len(self.names))
+        self.first_end_steps = array("l", [0] * len(self.names))
+
+        for start in range(len(self.names)):
+            node = start
+            for direction_idx in range(len(directions)):
+                node = self.step(node, direction_idx)
+
+                if self.is_end[node] and self.first_end_steps[start] == 0:
+                    self.first_end_steps[start] = direction_idx + 1
+
+            self.pass_targets[start] = node
+
+        # Binary lifting, level k is the node after 2^k passes and if any end node was hit during them.
+        # Pass start nodes repeat within len(names) passes, so a longer jump never finds a new end node
+        self.jumps = [self.pass_targets]
+        self.hits = [bytearray(steps > 0 for steps in self.first_end_steps)]
+
+        for _ in range(len(self.names).bit_length()):
+            jumps, hits = self.jumps[-1], self.hits[-1]
+
+            self.jumps.append(array("l", [jumps[jumps[node]] for node in range(len(self.names))]))
+            self.hits.append(bytearray(hits[node] | hits[jumps[node]] for node in range(len(self.names))))
+
+    def step(self, node: int, direction_idx: int) -> int:
+        return self.left[node] if self.directions[direction_idx] == "L" else self.right[node]
+
+    def get_number_of_steps(self, start_node: int) -> int:
+        node = start_node
+        passes = 0
+
+        for level in range(len(self.hits) - 1, -1, -1):
+            if not self.hits[level][node]:
+                node = self.jumps[level][node]
+                passes += 1 << level
+
+        if self.first_end_steps[node] == 0:
+            raise Exception("End node is never reached from " + self.names[start_node])
+
+        return passes * len(self.directions) + self.first_end_steps[node]
+
+    def walk(self, start_node: int, steps: int) -> int:
+        passes, remaining_steps = divmod(steps, len(self.directions))
 
+        # hits are only needed for the first levels, longer walks extend jumps on demand
+        while len(self.jumps) < passes.bit_length():
+            jumps = self.jumps[-1]
+            self.jumps.append(array("l", [jumps[jumps[node]] for node in range(len(self.names))]))
+
+        node = start_node
+        for level in range(passes.bit_length()):
+            if passes >> level & 1:
+                node = self.jumps[level][node]
+
+        for direction_idx in range(remaining_steps):
+            node = self.step(node, direction_idx)
+
+        return node
+
+
+class Cycle:
+    # Steps to end nodes before the cycle are kept as is, end nodes in the cycle as positions from the cycle start
+    def __init__(self, offset: int, length: int, pre_cycle_end_steps: list[int], cycle_end_positions: list[int]):
+        self.offset = offset
+        self.length = length
+        self.pre_cycle_end_steps = pre_cycle_end_steps
+        self.cycle_end_positions = cycle_end_positions
+
+    def is_end_step(self, steps: int) -> bool:
+        if steps < self.offset:
+            return steps in self.pre_cycle_end_steps
+
+        return (steps - self.offset) % self.length in self.cycle_end_positions
+
+
+def find_cycle(directions: str, left: array, right: array, is_end: bytearray, start_node: int) -> Cycle:
+    # State is (node, direction index), walk until a state repeats
+    first_seen = {}
+    end_steps = []
+
+    node = start_node
     steps = 0
-    while True:
-        if directions[steps % len(directions)] == "L":
-            node = m[node][0]
-        else:
-            node = m[node][1]
 
+    while (node, steps % len(directions)) not in first_seen:
+        first_seen[(node, steps % len(directions))] = steps
+
+        if is_end[node]:
+            end_steps.append(steps)
+
+        node = left[node] if directions[steps % len(directions)] == "L" else right[node]
         steps += 1
 
-        if node in end_nodes:
-            break
+    offset = first_seen[(node, steps % len(directions))]
+
+    return Cycle(
+        offset=offset,
+        length=steps - offset,
+        # start node doesn't count as reached end node
+        pre_cycle_end_steps=[s for s in end_steps if 0 < s < offset],
+        cycle_end_positions=[s - offset for s in end_steps if s >= offset],
+    )
+
+
+def get_first_common_end_step(cycles: list[Cycle]) -> int:
+    candidates = []
+
+    # all ghosts stand on end nodes either before some cycle starts...
+    for cycle in cycles:
+        for steps in cycle.pre_cycle_end_steps:
+            if all(c.is_end_step(steps) for c in cycles):
+                candidates.append(steps)
+
+    # ...or when every ghost is already cycling, then steps solve a system of congruences
+    min_steps = max(max(cycle.offset for cycle in cycles), 1)
+
+    for positions in product(*[cycle.cycle_end_positions for cycle in cycles]):
+        congruences = [(cycle.offset + position, cycle.length) for cycle, position in zip(cycles, positions)]
+        solution = reduce(combine_congruences, congruences, (0, 1))
+
+        if solution is not None:
+            remainder, modulus = solution
+            candidates.append(remainder + (min_steps - remainder + modulus - 1) // modulus * modulus)
+
+    if len(candidates) == 0:
+        raise Exception("Ghosts never stand on end nodes at the same time")
+
+    return min(candidates)
+
+
+def combine_congruences(x: Optional[tuple[int, int]], y: tuple[int, int]) -> Optional[tuple[int, int]]:
+    # Chinese remainder theorem for moduli that are not necessarily coprime
+    if x is None:
+        return None
+
+    r1, m1 = x
+    r2, m2 = y
+    gcd = compute_gcd(m1, m2)
+
+    if (r2 - r1) % gcd != 0:
+        return None
+
+    lcm = compute_lcm(m1, m2)
+    k = (r2 - r1) // gcd * pow(m1 // gcd, -1, m2 // gcd) % (m2 // gcd)
 
-    return steps
+    return (r1 + k * m1) % lcm, lcm
 
 
 def compute_gcd(x: int, y: int) -> int:
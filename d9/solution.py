@@ -1,21 +1,98 @@
-def solve_part_1(lines: list[str]) -> int:
+from collections import defaultdict
+from functools import cache
+from math import comb
+from operator import mul
+from typing import Iterable
+
+
+def solve_part_1(lines: Iterable[str]) -> int:
     result = 0
 
     for line in lines:
-        result += forecast_element([int(num_str) for num_str in line.split(" ")], True)
+        result += forecast_closed_form([int(num_str) for num_str in line.split(" ")], True)
 
     return result
 
 
-def solve_part_2(lines: list[str]) -> int:
+def solve_part_2(lines: Iterable[str]) -> int:
     result = 0
 
     for line in lines:
-        result += forecast_element([int(num_str) for num_str in line.split(" ")], False)
+        result += forecast_closed_form([int(num_str) for num_str in line.split(" ")], False)
+
+    return result
+
+
+def solve_both_parts(lines: Iterable[str]) -> tuple[int, int]:
+    result_1 = 0
+    result_2 = 0
+
+    for line in lines:
+        numbers = [int(num_str) for num_str in line.split(" ")]
+
+        result_1 += forecast_closed_form(numbers, True)
+        result_2 += forecast_closed_form(numbers, False)
+
+    return result_1, result_2
+
+
+# Forecast is a fixed binomial weighted sum of the numbers, same as the pyramid with the n-th derivative being 0
+def forecast_closed_form(numbers: list[int], forward: bool) -> int:
+    return sum(map(mul, get_forecast_weights(len(numbers), forward), numbers))
+
+
+def forecast_elements(series: list[list[int]], forward: bool) -> list[int]:
+    result = [0] * len(series)
+
+    # group series by length, every group is one matrix-vector product with the same weights
+    groups = defaultdict(list)
+    for idx, numbers in enumerate(series):
+        groups[len(numbers)].append(idx)
+
+    for length, indexes in groups.items():
+        weights = get_forecast_weights(length, forward)
+
+        for idx in indexes:
+            result[idx] = sum(map(mul, weights, series[idx]))
 
     return result
 
 
+@cache
+def get_forecast_weights(length: int, forward: bool) -> tuple[int, ...]:
+    if forward:
+        return tuple((-1) ** (length - 1 - idx) * comb(length, idx) for idx in range(length))
+
+    return tuple((-1) ** idx * comb(length, idx + 1) for idx in range(length))
+
+
+class Forecaster:
+    # Keeps last and first elements of every difference table row, appending a number updates them in O(depth)
+    def __init__(self):
+        self.last_diagonal: list[int] = []
+        self.first_diagonal: list[int] = []
+
+        self.next_element = 0
+        self.previous_element = 0
+
+    def append(self, number: int) -> None:
+        value = number
+
+        for depth, last in enumerate(self.last_diagonal):
+            self.last_diagonal[depth] = value
+            value -= last
+
+        # new row of length 1 at the bottom of the table
+        self.last_diagonal.append(value)
+        self.first_diagonal.append(value)
+
+        self.next_element = sum(self.last_diagonal)
+        self.previous_element += (-1) ** (len(self.first_diagonal) - 1) * value
+
+    def get_forecast(self, forward: bool) -> int:
+        return self.next_element if forward else self.previous_element
+
+
 def forecast_element(numbers: list[int], forward: bool) -> int:
     pyramid = [numbers]
 
@@ -40,7 +117,7 @@ def get_derivatives(numbers: list[int]) -> list[int]:
 
 if __name__ == "__main__":
     with open("input.txt") as f:
-        lines = [line.strip() for line in f.readlines()]
+        result_1, result_2 = solve_both_parts(line.strip() for line in f)
 
-        print(f"Part 1: {solve_part_1(lines)}")  # 2075724761
-        print(f"Part 2: {solve_part_2(lines)}")  # 1072
+        print(f"Part 1: {result_1}")  # 2075724761
+        print(f"Part 2: {result_2}")  # 1072